@@ -0,0 +1,32 @@
+"""
+Queue-based logging handlers.
+Records are enqueued by the calling thread and written to the console by a
+background listener, so request and WebSocket handlers never block on I/O.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+
+
+def queued_console_handler():
+    """
+    Build a QueueHandler that feeds a console writer on a background thread.
+    Used as a handler factory in the LOGGING configuration.
+    
+    The listener is started once per process and stopped at exit, which
+    flushes any records still waiting in the queue.
+    """
+    global _listener
+    
+    if _listener is None:
+        # Records arrive already formatted by the QueueHandler
+        console_handler = logging.StreamHandler()
+        _listener = QueueListener(_log_queue, console_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+    
+    return QueueHandler(_log_queue)
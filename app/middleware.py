@@ -5,6 +5,8 @@ Provides structured logging for all HTTP requests without exposing sensitive dat
 import logging
 import time
 
+from django.conf import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,45 +19,59 @@ class RequestLoggingMiddleware:
     - Does not log Authorization headers or tokens
     - Does not log cookie data
     - Only logs basic request metadata and response status
+    
+    Paths starting with any of settings.REQUEST_LOG_EXCLUDE_PREFIXES are not logged.
     """
     
     def __init__(self, get_response):
         self.get_response = get_response
+        self.exclude_prefixes = tuple(getattr(settings, 'REQUEST_LOG_EXCLUDE_PREFIXES', ()))
     
     def __call__(self, request):
-        # Capture request start time for performance monitoring
-        start_time = time.time()
+        # Static files, health checks and metrics are passed straight through
+        if request.path.startswith(self.exclude_prefixes):
+            return self.get_response(request)
         
-        # Get user information (handle unauthenticated requests)
-        user = "anonymous"
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            user = request.user.username
+        # Capture request start time with the monotonic clock (integer nanoseconds)
+        start_ns = time.monotonic_ns()
         
         # Process the request
         response = self.get_response(request)
         
         # Calculate request duration
-        duration = time.time() - start_time
-        
-        # Build log message with structured data
-        log_message = (
-            f"method={request.method} "
-            f"path={request.path} "
-            f"user={user} "
-            f"status={response.status_code} "
-            f"duration={duration:.3f}s"
-        )
+        duration = (time.monotonic_ns() - start_ns) / 1e9
         
-        # Log at appropriate level based on response status
-        if response.status_code < 400:
+        # Pick log level based on response status
+        status_code = response.status_code
+        if status_code < 400:
             # Success (2xx, 3xx)
-            logger.info(log_message)
-        elif response.status_code < 500:
+            level = logging.INFO
+        elif status_code < 500:
             # Client error (4xx)
-            logger.warning(log_message)
+            level = logging.WARNING
         else:
             # Server error (5xx)
-            logger.error(log_message)
+            level = logging.ERROR
+        
+        # Skip user lookup and formatting entirely when the record would be dropped
+        if not logger.isEnabledFor(level):
+            return response
+        
+        # Get user information (handle unauthenticated requests)
+        user = "anonymous"
+        request_user = getattr(request, 'user', None)
+        if request_user is not None and request_user.is_authenticated:
+            user = request_user.username
+        
+        # Structured message, formatted lazily by the logging handler
+        logger.log(
+            level,
+            "method=%s path=%s user=%s status=%d duration=%.3fs",
+            request.method,
+            request.path,
+            user,
+            status_code,
+            duration,
+        )
         
         return response
-
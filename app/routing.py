@@ -3,10 +3,46 @@ WebSocket routing configuration for the app.
 Defines URL patterns for WebSocket connections.
 """
 from django.urls import re_path
+from django.urls.resolvers import URLPattern
 from app_prompts.consumers import PromptConsumer, InvalidConsumer
 
+
+class UsernameRoutePattern:
+    r"""
+    Matches '<prefix><username>/' with plain string checks instead of a regex.
+    
+    Equivalent to re_path(r'<prefix>(?P<username>\w+)/$'): the username must be
+    non-empty and consist only of word characters (letters, digits, underscore).
+    """
+
+    def __init__(self, prefix, name=None):
+        self.prefix = prefix
+        self.name = name
+        self.converters = {}
+
+    def match(self, path):
+        """Return ('', (), {'username': ...}) on a match, otherwise None."""
+        if not path.startswith(self.prefix) or not path.endswith('/'):
+            return None
+        
+        username = path[len(self.prefix):-1]
+        # isalnum() covers the same characters as \w apart from the underscore
+        if not username.replace('_', 'a').isalnum():
+            return None
+        
+        return '', (), {'username': username}
+
+    def check(self):
+        return []
+
+    def describe(self):
+        return f"'{self}'"
+
+    def __str__(self):
+        return f"{self.prefix}<username>/"
+
+
 websocket_urlpatterns = [
-    re_path(r'ws/prompts/(?P<username>\w+)/$', PromptConsumer.as_asgi()),
+    URLPattern(UsernameRoutePattern('ws/prompts/'), PromptConsumer.as_asgi()),
     re_path(r'^.*$', InvalidConsumer.as_asgi()),
 ]
-
@@ -0,0 +1,25 @@
+"""
+Daphne entry point that runs the ASGI server on the uvloop event loop.
+
+Daphne creates its event loop when daphne.server is imported, before the
+application in asgi.py is loaded, so the uvloop policy must be installed
+here rather than in asgi.py.
+
+Usage:
+    python -m app.server -b 0.0.0.0 -p 8000 app.asgi:application
+"""
+import asyncio
+
+import uvloop
+
+
+def main():
+    """Install the uvloop policy, then hand the command line to Daphne."""
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
+    from daphne.cli import CommandLineInterface
+    CommandLineInterface.entrypoint()
+
+
+if __name__ == "__main__":
+    main()
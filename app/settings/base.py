@@ -67,6 +67,7 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'user': '10/minute',
         'prompt': '1/second',
+        'prompt_batch': '1/minute',
     },
 }
 
@@ -162,36 +163,39 @@ LOGGING = {
         },
     },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
+        # Enqueues records; a background listener writes them to the console
+        'queue': {
+            '()': 'app.log_handlers.queued_console_handler',
             'formatter': 'verbose',
         },
     },
     'loggers': {
         'django': {
-            'handlers': ['console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'django.request': {
-            'handlers': ['console'],
+            'handlers': ['queue'],
             'level': 'WARNING',
             'propagate': False,
         },
         'app_prompts': {
-            'handlers': ['console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'services': {
-            'handlers': ['console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
     },
     'root': {
-        'handlers': ['console'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
 }
 
+# Request paths that RequestLoggingMiddleware passes through without timing or logging
+REQUEST_LOG_EXCLUDE_PREFIXES = ('/static/', '/media/', '/health/', '/healthz/', '/metrics/')
@@ -28,20 +28,27 @@ X_FRAME_OPTIONS = 'DENY'
 DATABASES['default']['HOST'] = os.getenv('DB_HOST', 'db')
 
 # Channel Layers configuration
-# For production, consider using Redis:
-# CHANNEL_LAYERS = {
-#     "default": {
-#         "BACKEND": "channels_redis.core.RedisChannelLayer",
-#         "CONFIG": {
-#             "hosts": [(os.getenv('REDIS_HOST', 'redis'), 6379)],
-#         },
-#     },
-# }
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+# Redis is required to share groups across workers: with the in-memory layer a
+# prompt created on one worker cannot reach a WebSocket held by another.
+# Falls back to the in-memory layer when REDIS_URL is not set (single worker).
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [REDIS_URL],
+                "capacity": 1500,
+                "expiry": 10,
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer"
+        }
     }
-}
 
 # Logging - more restrictive in production
 LOGGING['loggers']['django']['level'] = 'WARNING'
@@ -1,13 +1,56 @@
 """
 WebSocket consumers for real-time prompt response streaming.
 """
-import json
 import logging
+import time
+import orjson
 from channels.generic.websocket import AsyncWebsocketConsumer
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Constant envelope around prompt responses, joined as bytes per message
+_PROMPT_RESPONSE_PREFIX = b'{"type":"prompt_response","data":'
+_TIMESTAMP_PREFIX = b',"timestamp":"'
+_MESSAGE_SUFFIX = b'"}'
+
+# Canonical keepalive frame, answered without going through the JSON parser
+_PING_MESSAGE = '{"type":"ping"}'
+_PING_MESSAGE_BYTES = _PING_MESSAGE.encode()
+_PONG_PREFIX = '{"type":"pong","timestamp":"'
+
+# Incoming messages are small JSON objects; anything larger is rejected unparsed
+MAX_MESSAGE_SIZE = 4096
+_OBJECT_START = ('{', b'{')
+
+# Last formatted timestamp, reused while the clock stays on the same microsecond
+_last_timestamp_us = None
+_last_timestamp_str = ""
+
+
+def _now_iso():
+    """
+    Return the current UTC time as an ISO 8601 string.
+    Formatting is skipped when called again within the same microsecond,
+    and otherwise uses integer arithmetic without building datetime objects.
+    """
+    global _last_timestamp_us, _last_timestamp_str
+    
+    timestamp_us = time.time_ns() // 1000
+    if timestamp_us != _last_timestamp_us:
+        seconds, micros = divmod(timestamp_us, 1_000_000)
+        tm = time.gmtime(seconds)
+        _last_timestamp_str = (
+            f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+            f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{micros:06d}"
+        )
+        _last_timestamp_us = timestamp_us
+    return _last_timestamp_str
+
+
+def _dumps(payload):
+    """Serialize a payload to a JSON text frame using orjson."""
+    return orjson.dumps(payload).decode()
+
 
 class PromptConsumer(AsyncWebsocketConsumer):
     """
@@ -27,7 +70,7 @@ class PromptConsumer(AsyncWebsocketConsumer):
         if not self.username:
             logger.warning("WebSocket connection rejected: missing username parameter")
             await self.accept()
-            await self.send(json.dumps({
+            await self.send(_dumps({
                 "error": "Missing 'username' parameter. Use ws://host/ws/prompts/<username>/"
             }))
             await self.close(code=4000)
@@ -45,7 +88,7 @@ class PromptConsumer(AsyncWebsocketConsumer):
         await self.accept()
         
         # Send connection confirmation
-        await self.send(json.dumps({
+        await self.send(_dumps({
             "message": f"Connected to WebSocket room '{self.username}'."
         }))
         
@@ -64,49 +107,69 @@ class PromptConsumer(AsyncWebsocketConsumer):
         
         logger.info(f"WebSocket disconnected: user={self.username}, close_code={close_code}")
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """
         Handle messages received from WebSocket client.
         Supports ping/pong for connectivity testing and echo for general testing.
+        Text and binary frames are handled the same way.
         """
-        # Ignore empty or whitespace-only messages
-        if not text_data or not text_data.strip():
+        payload = text_data if text_data is not None else bytes_data
+        
+        # Ignore empty or whitespace-only messages (isspace does not allocate)
+        if not payload or payload.isspace():
+            return
+        
+        # Fast path for the canonical ping frame: skip parsing and serialization
+        if payload == _PING_MESSAGE or payload == _PING_MESSAGE_BYTES:
+            await self.send(_PONG_PREFIX + _now_iso() + '"}')
+            return
+        
+        # Cheap checks before parsing: bounded size and a JSON object
+        size = len(payload)
+        if size <= MAX_MESSAGE_SIZE and isinstance(payload, str) and not payload.isascii():
+            # Text frames are limited by their UTF-8 size, the same as binary frames
+            size = len(payload.encode())
+        if size > MAX_MESSAGE_SIZE or payload.lstrip()[:1] not in _OBJECT_START:
+            logger.warning(f"Rejected WebSocket payload from user={self.username}: {size} bytes")
+            await self._send_error("Payload too large or not a JSON object")
             return
         
         try:
-            data = json.loads(text_data)
-            logger.info(f"WebSocket received from user={self.username}: {data}")
+            data = orjson.loads(payload)
+            # Formatting the payload is costly; only do it when INFO is logged
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("WebSocket received from user=%s: %s", self.username, data)
             
             # Validate that the message has a 'type' field
             if 'type' not in data:
-                await self.send(json.dumps({
-                    "type": "error",
-                    "message": "Missing 'type' field",
-                    "timestamp": datetime.utcnow().isoformat()
-                }))
+                await self._send_error("Missing 'type' field")
                 return
             
             # Handle ping message for connectivity testing
             if data['type'] == 'ping':
-                await self.send(json.dumps({
+                await self.send(_dumps({
                     "type": "pong",
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": _now_iso()
                 }))
                 return
             
             # Echo the received data back to the client
-            await self.send(json.dumps({
+            await self.send(_dumps({
                 "type": "echo",
                 "data": data,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _now_iso()
             }))
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON received from user={self.username}: {e}")
-            await self.send(json.dumps({
-                "type": "error",
-                "message": "Invalid JSON format",
-                "timestamp": datetime.utcnow().isoformat()
-            }))
+            await self._send_error("Invalid JSON format")
+
+    async def _send_error(self, message):
+        """Send an error message to the WebSocket client."""
+        await self.send(_dumps({
+            "type": "error",
+            "message": message,
+            "timestamp": _now_iso()
+        }))
 
     async def send_prompt_response(self, event):
         """
@@ -116,14 +179,18 @@ class PromptConsumer(AsyncWebsocketConsumer):
         Args:
             event: Dict containing 'data' key with prompt information
         """
-        # Send prompt response to WebSocket
-        await self.send(json.dumps({
-            "type": "prompt_response",
-            "data": event["data"],
-            "timestamp": datetime.utcnow().isoformat()
-        }))
+        # Send prompt response to WebSocket, filling the prebuilt envelope
+        message = b''.join((
+            _PROMPT_RESPONSE_PREFIX,
+            orjson.dumps(event["data"]),
+            _TIMESTAMP_PREFIX,
+            _now_iso().encode(),
+            _MESSAGE_SUFFIX,
+        ))
+        await self.send(message.decode())
         
-        logger.info(f"Sent prompt response to user={self.username}, prompt_id={event['data'].get('id')}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sent prompt response to user=%s, prompt_id=%s", self.username, event['data'].get('id'))
 
 
 class InvalidConsumer(AsyncWebsocketConsumer):
@@ -139,7 +206,7 @@ class InvalidConsumer(AsyncWebsocketConsumer):
         """
         logger.warning("WebSocket connection rejected: invalid endpoint")
         await self.accept()
-        await self.send(json.dumps({
+        await self.send(_dumps({
             "error": "Invalid WebSocket endpoint. Use /ws/prompts/<username>/"
         }))
         await self.close(code=4001)
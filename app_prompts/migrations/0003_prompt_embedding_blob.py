@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-15 15:40
+
+import numpy as np
+from django.db import migrations, models
+
+
+def backfill_embedding_blob(apps, schema_editor):
+    """Store existing JSON embeddings as float16 bytes."""
+    Prompt = apps.get_model("app_prompts", "Prompt")
+    prompts = Prompt.objects.filter(embedding__isnull=False, embedding_blob__isnull=True)
+    for prompt in prompts.only("id", "embedding").iterator(chunk_size=1000):
+        prompt.embedding_blob = np.asarray(prompt.embedding, dtype="<f2").tobytes()
+        prompt.save(update_fields=["embedding_blob"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_prompts", "0002_prompt_embedding"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="prompt",
+            name="embedding_blob",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_embedding_blob, migrations.RunPython.noop),
+    ]
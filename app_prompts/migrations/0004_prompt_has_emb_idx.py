@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_prompts", "0003_prompt_embedding_blob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="prompt",
+            index=models.Index(
+                condition=models.Q(("embedding_blob__isnull", False)),
+                fields=["id"],
+                name="prompt_has_emb_idx",
+            ),
+        ),
+    ]
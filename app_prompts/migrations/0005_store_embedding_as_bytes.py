@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-15 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_prompts", "0004_prompt_has_emb_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="prompt",
+            name="prompt_has_emb_idx",
+        ),
+        migrations.RemoveField(
+            model_name="prompt",
+            name="embedding",
+        ),
+        migrations.RenameField(
+            model_name="prompt",
+            old_name="embedding_blob",
+            new_name="embedding",
+        ),
+        migrations.AddIndex(
+            model_name="prompt",
+            index=models.Index(
+                condition=models.Q(("embedding__isnull", False)),
+                fields=["id"],
+                name="prompt_has_emb_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-15 18:05
+
+import hashlib
+
+import numpy as np
+from django.db import migrations
+
+EMBEDDING_DIMENSION = 384
+
+
+def _shake_embedding(text):
+    """Frozen copy of the SHAKE-128 embedding used by services.get_embedding."""
+    text_normalized = text.lower().strip()
+    digest = hashlib.shake_128(text_normalized.encode("utf-8")).digest(EMBEDDING_DIMENSION * 4)
+    embedding = np.frombuffer(digest, dtype="<u4").astype(np.float32)
+    embedding *= np.float32(2.0 / 2**32)
+    embedding -= np.float32(1.0)
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding /= norm
+    return embedding
+
+
+def reembed_prompts(apps, schema_editor):
+    """Recompute stored embeddings, which still come from the per-dimension SHA-256 hash."""
+    Prompt = apps.get_model("app_prompts", "Prompt")
+    prompts = Prompt.objects.filter(embedding__isnull=False)
+    for prompt in prompts.only("id", "prompt_text").iterator(chunk_size=1000):
+        prompt.embedding = _shake_embedding(prompt.prompt_text).astype("<f2").tobytes()
+        prompt.save(update_fields=["embedding"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_prompts", "0005_store_embedding_as_bytes"),
+    ]
+
+    operations = [
+        migrations.RunPython(reembed_prompts, migrations.RunPython.noop),
+    ]
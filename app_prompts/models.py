@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
 
 
@@ -7,11 +8,20 @@ class Prompt(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='prompts')
     prompt_text = models.TextField()
     response_text = models.TextField()
-    embedding = models.JSONField(null=True, blank=True)
+    # Embedding vector as little-endian float16 bytes (768 bytes)
+    embedding = models.BinaryField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Covers the startup scan, which reads rows with a stored embedding in id order
+            models.Index(
+                fields=['id'],
+                condition=Q(embedding__isnull=False),
+                name='prompt_has_emb_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.prompt_text[:50]}"
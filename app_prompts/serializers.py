@@ -1,16 +1,28 @@
+import logging
+from django.db import transaction
 from rest_framework import serializers
 from .models import Prompt
+from . import services
+
+logger = logging.getLogger(__name__)
 
 
 class PromptSerializer(serializers.ModelSerializer):
     """Serializer for Prompt model - read-only with all fields."""
     user = serializers.ReadOnlyField(source='user.username')
+    embedding = serializers.SerializerMethodField()
 
     class Meta:
         model = Prompt
         fields = ['id', 'user', 'prompt_text', 'response_text', 'embedding', 'created_at']
         read_only_fields = ['id', 'user', 'prompt_text', 'response_text', 'embedding', 'created_at']
 
+    def get_embedding(self, obj):
+        """Decode the stored float16 bytes to a list only when rendering."""
+        if obj.embedding is None:
+            return None
+        return services.embedding_from_bytes(obj.embedding).tolist()
+
 
 class PromptCreateSerializer(serializers.Serializer):
     """Serializer for creating prompts - only accepts prompt_text and optional websocket flag."""
@@ -25,15 +37,104 @@ class PromptCreateSerializer(serializers.Serializer):
         help_text="Whether to send response via WebSocket (for Phase 4)"
     )
 
+    def to_internal_value(self, data):
+        """
+        Fast path for the common JSON body: a prompt_text string and an
+        optional boolean websocket flag are accepted in one pass. Any other input,
+        including everything that fails validation, goes through the regular
+        field-by-field validation so results and error messages are unchanged.
+        """
+        if type(data) is dict:
+            prompt_text = data.get('prompt_text')
+            websocket = data.get('websocket', False)
+            if type(prompt_text) is str and type(websocket) is bool:
+                # CharField trims whitespace by default
+                prompt_text = prompt_text.strip()
+                if prompt_text:
+                    try:
+                        self.fields['prompt_text'].run_validators(prompt_text)
+                        prompt_text = self.validate_prompt_text(prompt_text)
+                    except serializers.ValidationError:
+                        # Let the regular path build the per-field error response
+                        return super().to_internal_value(data)
+                    return {'prompt_text': prompt_text, 'websocket': websocket}
+        return super().to_internal_value(data)
+
     def validate_prompt_text(self, value):
         """Ensure prompt text is not empty after stripping."""
         if not value.strip():
             raise serializers.ValidationError("Prompt text cannot be empty.")
         return value
 
+    def create(self, validated_data):
+        """
+        Generate the response and embedding, save the prompt and index it.
+        Expects the owning user to be passed through save(user=...).
+        """
+        validated_data.pop('websocket', None)
+        prompt_text = validated_data['prompt_text']
+        username = validated_data['user'].username
+
+        # Generate response using service layer
+        logger.info(f"Generating response for user={username}, prompt_length={len(prompt_text)}")
+        response_text = services.generate_response(prompt_text)
+
+        # Compute embedding
+        logger.info(f"Computing embedding for user={username}")
+        embedding = services.get_embedding(prompt_text)
+
+        # Save to database; index only after commit so a rollback leaves no orphan vector
+        with transaction.atomic():
+            prompt = Prompt.objects.create(
+                response_text=response_text,
+                embedding=services.embedding_to_bytes(embedding),
+                **validated_data
+            )
+            transaction.on_commit(lambda: services.add_to_index(prompt.id, embedding))
+
+        return prompt
+
+
+class PromptBatchCreateSerializer(serializers.Serializer):
+    """Serializer for creating several prompts in one request."""
+    prompt_texts = serializers.ListField(
+        child=serializers.CharField(allow_blank=False),
+        allow_empty=False,
+        max_length=100,
+        help_text="The prompt texts to process"
+    )
+
+    def create(self, validated_data):
+        """
+        Generate responses and embeddings, save every prompt with one INSERT
+        and index them as one batch. Expects the owning user to be passed
+        through save(user=...). Returns the list of created prompts.
+        """
+        prompt_texts = validated_data['prompt_texts']
+        user = validated_data['user']
+
+        logger.info(f"Computing {len(prompt_texts)} embeddings for user={user.username}")
+        embeddings = services.get_embeddings_batch(prompt_texts)
+
+        # Save all rows with one INSERT, then add them to FAISS as one batch after commit
+        with transaction.atomic():
+            prompts = Prompt.objects.bulk_create([
+                Prompt(
+                    user=user,
+                    prompt_text=prompt_text,
+                    response_text=services.generate_response(prompt_text),
+                    embedding=services.embedding_to_bytes(embedding)
+                )
+                for prompt_text, embedding in zip(prompt_texts, embeddings)
+            ])
+            prompt_ids = [prompt.id for prompt in prompts]
+            transaction.on_commit(lambda: services.add_batch_to_index(prompt_ids, embeddings))
+
+        return prompts
+
 
 class PromptPublicSerializer(serializers.ModelSerializer):
-    """Public serializer for Prompt model - excludes embedding field."""
+    """Public serializer for Prompt model - excludes embedding fields."""
     user = serializers.ReadOnlyField(source='user.username')
 
     class Meta:
@@ -4,6 +4,11 @@ Provides clean separation between AI logic and REST API views.
 """
 import hashlib
 import logging
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 import faiss
 from typing import List, Tuple, Optional
@@ -12,8 +17,70 @@ logger = logging.getLogger(__name__)
 
 # Global FAISS index - in-memory, rebuilt on server restart
 EMBEDDING_DIMENSION = 384
+EMBEDDING_BYTES_SIZE = EMBEDDING_DIMENSION * 2  # float16 bytes per stored embedding
 _faiss_index = None
-_prompt_id_map = {}  # Maps FAISS index position to prompt ID
+_prompt_ids = np.empty(0, dtype=np.int64)  # Maps FAISS index position to prompt ID
+_loaded_count = 0  # Leading positions loaded from the database, in ascending prompt ID order
+
+# Additions queued by add_to_index and applied in batches by a background writer.
+# _index_lock guards the index and the position map against concurrent use.
+INDEX_FLUSH_INTERVAL = 0.02  # Seconds to wait for more vectors before a batch add
+_pending_additions = queue.SimpleQueue()
+_pending_event = threading.Event()
+_index_lock = threading.RLock()
+_index_writer_thread = None
+
+# Above this many stored vectors the index is built as IVF instead of a flat scan
+IVF_THRESHOLD = 10_000
+IVF_NPROBE = 16
+
+# Rows fetched per database round trip when loading stored embeddings
+LOAD_CHUNK_SIZE = 2000
+
+# Bounded LRU of computed embeddings, keyed by a digest of the normalized text
+EMBEDDING_CACHE_SIZE = 4096
+_embedding_cache = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+
+def _store_prompt_ids(position: int, prompt_ids: np.ndarray) -> None:
+    """
+    Write prompt IDs into the position map starting at the given position.
+    The backing array grows geometrically so appends stay amortized O(1).
+    """
+    global _prompt_ids
+    
+    required = position + len(prompt_ids)
+    if required > len(_prompt_ids):
+        capacity = max(required, 2 * len(_prompt_ids), 64)
+        grown = np.empty(capacity, dtype=np.int64)
+        grown[:position] = _prompt_ids[:position]
+        _prompt_ids = grown
+    
+    _prompt_ids[position:required] = prompt_ids
+
+
+def _build_index(embeddings: np.ndarray):
+    """
+    Create an index suited to the number of vectors being loaded.
+    
+    Small collections use an exact flat scan. Larger ones use IndexIVFFlat,
+    trained on the loaded vectors, so a search only visits IVF_NPROBE clusters.
+    """
+    # Embeddings are unit-normalized, so inner product ranks like L2 distance
+    n = len(embeddings)
+    if n <= IVF_THRESHOLD:
+        return faiss.IndexFlatIP(EMBEDDING_DIMENSION)
+    
+    # ~4*sqrt(n) lists, capped so each centroid gets at least 39 training points
+    nlist = max(1, min(int(4 * np.sqrt(n)), n // 39))
+    quantizer = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
+    index = faiss.IndexIVFFlat(quantizer, EMBEDDING_DIMENSION, nlist, faiss.METRIC_INNER_PRODUCT)
+    index.train(embeddings)
+    index.nprobe = IVF_NPROBE
+    
+    logger.info(f"Built IVF index with {nlist} lists for {n} embeddings")
+    return index
 
 
 def initialize_index():
@@ -21,35 +88,181 @@ def initialize_index():
     Initialize the FAISS index for similarity search.
     Loads all existing embeddings from the database.
     """
-    global _faiss_index, _prompt_id_map
+    with _index_lock:
+        # Queued additions are already stored in the database and get reloaded
+        _drain_pending()
+        _load_index()
+
+
+def _load_index():
+    """Rebuild the index from stored embeddings. Caller must hold _index_lock."""
+    global _faiss_index, _prompt_ids, _loaded_count
     
-    # Create L2 distance index
-    _faiss_index = faiss.IndexFlatL2(EMBEDDING_DIMENSION)
-    _prompt_id_map = {}
+    _prompt_ids = np.empty(0, dtype=np.int64)
+    _loaded_count = 0
     
     # Import here to avoid circular imports
     from .models import Prompt
     
-    prompts_with_embeddings = Prompt.objects.filter(
-        embedding__isnull=False
-    ).values_list('id', 'embedding')
+    # Scan in ID order rather than Meta.ordering so the partial index on id serves it
+    prompts_with_embeddings = Prompt.objects.filter(embedding__isnull=False).order_by('id')
+    
+    # Preallocate contiguous buffers, then stream rows into them in chunks
+    capacity = max(prompts_with_embeddings.count(), 1)
+    embedding_matrix = np.empty((capacity, EMBEDDING_DIMENSION), dtype=np.float32)
+    prompt_ids = np.empty(capacity, dtype=np.int64)
+    
+    loaded = 0
+    rows = prompts_with_embeddings.values_list('id', 'embedding').iterator(chunk_size=LOAD_CHUNK_SIZE)
+    for prompt_id, embedding_bytes in rows:
+        # Rows inserted after the count still get loaded
+        if loaded == capacity:
+            capacity *= 2
+            embedding_matrix = np.resize(embedding_matrix, (capacity, EMBEDDING_DIMENSION))
+            prompt_ids = np.resize(prompt_ids, capacity)
+        if len(embedding_bytes) == EMBEDDING_BYTES_SIZE:
+            # Decodes float16 bytes without copying, widened to float32 on assignment
+            embedding_matrix[loaded] = np.frombuffer(embedding_bytes, dtype='<f2')
+            prompt_ids[loaded] = prompt_id
+            loaded += 1
+    
+    embedding_matrix = embedding_matrix[:loaded]
+    _faiss_index = _build_index(embedding_matrix)
     
-    for prompt_id, embedding in prompts_with_embeddings:
-        if embedding and len(embedding) == EMBEDDING_DIMENSION:
-            embedding_array = np.array([embedding], dtype=np.float32)
-            position = _faiss_index.ntotal
-            _faiss_index.add(embedding_array)
-            _prompt_id_map[position] = prompt_id
+    # Add every stored vector in a single contiguous batch
+    if loaded:
+        _faiss_index.add(embedding_matrix)
+        _store_prompt_ids(0, prompt_ids[:loaded])
+        _loaded_count = loaded
     
     logger.info(f"FAISS index initialized with {_faiss_index.ntotal} embeddings")
 
 
+def reset_index():
+    """
+    Empty the FAISS index without querying the database.
+    Used by tests that need a known-empty index.
+    """
+    global _faiss_index, _prompt_ids, _loaded_count
+    
+    with _index_lock:
+        _drain_pending()
+        # A fresh flat index, so a promoted IVF index does not survive the reset
+        _faiss_index = faiss.IndexFlatIP(EMBEDDING_DIMENSION)
+        _prompt_ids = np.empty(0, dtype=np.int64)
+        _loaded_count = 0
+
+
 def get_faiss_index():
-    """Get or initialize the FAISS index."""
+    """Get or initialize the FAISS index, applying any queued additions first."""
+    with _index_lock:
+        if _faiss_index is None:
+            initialize_index()
+        _flush_pending()
+        return _faiss_index
+
+
+def _drain_pending() -> list:
+    """Remove and return every queued (prompt_ids, embeddings) batch."""
+    batches = []
+    while True:
+        try:
+            batches.append(_pending_additions.get_nowait())
+        except queue.Empty:
+            return batches
+
+
+def _flush_pending() -> None:
+    """Add all queued embeddings to the index in one call. Caller must hold _index_lock."""
+    batches = _drain_pending()
+    if not batches:
+        return
+    
+    prompt_ids = np.concatenate([ids for ids, _ in batches])
+    embeddings = np.concatenate([vectors for _, vectors in batches])
+    
+    # Rows committed while the index was loading are queued by on_commit but may
+    # already have been read by the scan
+    if _loaded_count:
+        loaded_ids = _prompt_ids[:_loaded_count]
+        positions = np.minimum(np.searchsorted(loaded_ids, prompt_ids), _loaded_count - 1)
+        new_rows = loaded_ids[positions] != prompt_ids
+        if not new_rows.all():
+            prompt_ids = prompt_ids[new_rows]
+            embeddings = embeddings[new_rows]
+            if not len(prompt_ids):
+                return
+    
+    position = _faiss_index.ntotal
+    _faiss_index.add(embeddings)
+    _store_prompt_ids(position, prompt_ids)
+    
+    logger.info(f"Added {len(prompt_ids)} embeddings to FAISS index at position {position}")
+    
+    # A flat index that has grown past the threshold is rebuilt as IVF once
+    if isinstance(_faiss_index, faiss.IndexFlat) and _faiss_index.ntotal > IVF_THRESHOLD:
+        _promote_to_ivf()
+
+
+def _promote_to_ivf() -> None:
+    """
+    Replace the flat index with an IVF index holding the same vectors.
+    Positions are preserved, so the prompt ID map stays valid. Caller must hold _index_lock.
+    """
     global _faiss_index
-    if _faiss_index is None:
-        initialize_index()
-    return _faiss_index
+    
+    embeddings = _faiss_index.reconstruct_n(0, _faiss_index.ntotal)
+    index = _build_index(embeddings)
+    index.add(embeddings)
+    _faiss_index = index
+
+
+def _index_writer() -> None:
+    """Background loop that applies queued additions in batches."""
+    while True:
+        _pending_event.wait()
+        # Let concurrent requests queue more vectors into the same batch
+        time.sleep(INDEX_FLUSH_INTERVAL)
+        _pending_event.clear()
+        with _index_lock:
+            if _faiss_index is not None:
+                _flush_pending()
+
+
+def _start_index_writer() -> None:
+    """Start the background index writer once per process."""
+    global _index_writer_thread
+    
+    with _index_lock:
+        if _index_writer_thread is None:
+            _index_writer_thread = threading.Thread(
+                target=_index_writer, name='faiss-index-writer', daemon=True
+            )
+            _index_writer_thread.start()
+
+
+# Keyword categories checked in priority order by generate_response.
+# Each category is one precompiled alternation, so a prompt is scanned once
+# per category in C instead of once per keyword.
+_RESPONSE_RULES = (
+    (
+        re.compile('hello|hi|hey'),
+        "Hello! You said: '{prompt}'. How can I assist you today?",
+    ),
+    (
+        re.compile('what|how|why|when|where|who'),
+        "That's an interesting question about: '{prompt}'. Let me help you with that. Based on my analysis, here's what I can tell you...",
+    ),
+    (
+        re.compile('explain|describe|tell me'),
+        "I'd be happy to explain. Regarding '{prompt}', here's a comprehensive overview of the topic...",
+    ),
+    (
+        re.compile('help|assist|support'),
+        "I'm here to help with '{prompt}'. Let me provide you with some guidance on this matter...",
+    ),
+)
+_DEFAULT_RESPONSE = "Thank you for your input: '{prompt}'. I've processed your request and here's my response. This is a simulated answer that demonstrates the system's capability to generate contextual responses."
 
 
 def generate_response(prompt_text: str) -> str:
@@ -68,83 +281,187 @@ def generate_response(prompt_text: str) -> str:
     # Simulate different response types based on prompt content
     prompt_lower = prompt_text.lower()
     
-    if any(word in prompt_lower for word in ['hello', 'hi', 'hey']):
-        return f"Hello! You said: '{prompt_text}'. How can I assist you today?"
-    elif any(word in prompt_lower for word in ['what', 'how', 'why', 'when', 'where', 'who']):
-        return f"That's an interesting question about: '{prompt_text}'. Let me help you with that. Based on my analysis, here's what I can tell you..."
-    elif any(word in prompt_lower for word in ['explain', 'describe', 'tell me']):
-        return f"I'd be happy to explain. Regarding '{prompt_text}', here's a comprehensive overview of the topic..."
-    elif any(word in prompt_lower for word in ['help', 'assist', 'support']):
-        return f"I'm here to help with '{prompt_text}'. Let me provide you with some guidance on this matter..."
-    else:
-        return f"Thank you for your input: '{prompt_text}'. I've processed your request and here's my response. This is a simulated answer that demonstrates the system's capability to generate contextual responses."
+    for keywords, template in _RESPONSE_RULES:
+        if keywords.search(prompt_lower):
+            return template.format(prompt=prompt_text)
+    return _DEFAULT_RESPONSE.format(prompt=prompt_text)
 
 
-def get_embedding(text: str) -> List[float]:
+def get_embedding(text: str) -> np.ndarray:
     """
     Generate a deterministic 384-dimensional embedding vector for the given text.
     Uses a simple hashing-based approach for consistent results.
+    Results are memoized, so repeated texts skip the computation.
     In production, this would use a real embedding model.
     
     Args:
         text: The text to embed
         
     Returns:
-        A list of 384 float values representing the embedding
+        A read-only contiguous float32 array of 384 values, shared with the
+        cache (use .tolist() where a JSON-serializable value is needed)
     """
-    logger.info(f"Computing embedding vector (dimension={EMBEDDING_DIMENSION}) for text (length={len(text)} chars)")
-    
-    # Use multiple hash functions to generate diverse vector components
-    embedding = []
+    return _cached_embedding(text)
+
+
+def get_embeddings_batch(texts: List[str]) -> np.ndarray:
+    """
+    Generate embeddings for several texts at once.
     
+    Args:
+        texts: The texts to embed
+        
+    Returns:
+        A contiguous (N, 384) float32 matrix, one row per text
+    """
+    embeddings = np.empty((len(texts), EMBEDDING_DIMENSION), dtype=np.float32)
+    for row, text in enumerate(texts):
+        embeddings[row] = get_embedding(text)
+    return embeddings
+
+
+def clear_embedding_cache() -> None:
+    """Drop all memoized embeddings."""
+    with _embedding_cache_lock:
+        _embedding_cache.clear()
+
+
+def _cached_embedding(text: str) -> np.ndarray:
+    """
+    Return the embedding for the given text from the LRU cache, computing it on a miss.
+    The returned array is read-only because it is shared between callers.
+    """
     # Normalize text for consistent embeddings
     text_normalized = text.lower().strip()
     
-    # Generate 384 dimensions using multiple hash seeds
-    for i in range(EMBEDDING_DIMENSION):
-        # Create a unique hash for each dimension
-        hash_input = f"{text_normalized}_{i}".encode('utf-8')
-        hash_value = hashlib.sha256(hash_input).hexdigest()
-        
-        # Convert hex to float in range [-1, 1]
-        int_value = int(hash_value[:8], 16)
-        float_value = (int_value / (16**8)) * 2 - 1
-        embedding.append(float_value)
+    # Fixed-size digest keeps key memory bounded for very long prompts
+    key = hashlib.blake2b(text_normalized.encode('utf-8'), digest_size=16).digest()
+    
+    with _embedding_cache_lock:
+        embedding_array = _embedding_cache.get(key)
+        if embedding_array is not None:
+            _embedding_cache.move_to_end(key)
+            return embedding_array
+    
+    logger.info(f"Computing embedding vector (dimension={EMBEDDING_DIMENSION}) for text (length={len(text)} chars)")
+    
+    embedding_array = _compute_embedding(text_normalized)
+    embedding_array.flags.writeable = False
+    
+    with _embedding_cache_lock:
+        _embedding_cache[key] = embedding_array
+        if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    
+    return embedding_array
+
+
+def _compute_embedding(text_normalized: str) -> np.ndarray:
+    """
+    Compute the normalized embedding for already-normalized text as a float32 array.
+    
+    A single SHAKE-128 digest is expanded to 4 bytes per dimension and the
+    whole buffer is converted with NumPy, instead of hashing once per dimension.
+    """
+    # One extendable-output hash provides the bytes for every dimension
+    digest = hashlib.shake_128(text_normalized.encode('utf-8')).digest(EMBEDDING_DIMENSION * 4)
+    
+    # Map each little-endian uint32 to a float in range [-1, 1)
+    embedding_array = np.frombuffer(digest, dtype='<u4').astype(np.float32)
+    embedding_array *= np.float32(2.0 / 2**32)
+    embedding_array -= np.float32(1.0)
     
     # Normalize the vector to unit length (L2 normalization)
-    embedding_array = np.array(embedding, dtype=np.float32)
     norm = np.linalg.norm(embedding_array)
     if norm > 0:
-        embedding_array = embedding_array / norm
+        embedding_array /= norm
     
-    return embedding_array.tolist()
+    return embedding_array
 
 
-def add_to_index(prompt_id: int, embedding: List[float]) -> None:
+def embedding_to_bytes(embedding: np.ndarray) -> bytes:
     """
-    Add a prompt's embedding to the FAISS index.
+    Encode an embedding for the Prompt.embedding column.
     
     Args:
-        prompt_id: The database ID of the prompt
         embedding: The 384-dimensional embedding vector
+        
+    Returns:
+        The vector as little-endian float16 bytes
+    """
+    return np.asarray(embedding, dtype='<f2').tobytes()
+
+
+def embedding_from_bytes(data: bytes) -> np.ndarray:
+    """
+    Decode a stored Prompt.embedding value.
+    
+    Args:
+        data: Little-endian float16 bytes as written by embedding_to_bytes()
+        
+    Returns:
+        The 384-dimensional embedding as a float32 array
+    """
+    return np.frombuffer(data, dtype='<f2').astype(np.float32)
+
+
+def add_to_index(prompt_id: int, embedding: np.ndarray) -> None:
     """
-    global _prompt_id_map
+    Queue a prompt's embedding for the FAISS index and return immediately.
+    A background writer adds queued embeddings in batches; readers going
+    through get_faiss_index() or find_similar() always see them.
     
+    Args:
+        prompt_id: The database ID of the prompt
+        embedding: The 384-dimensional embedding vector
+    """
     if len(embedding) != EMBEDDING_DIMENSION:
         logger.error(f"Invalid embedding dimension: {len(embedding)}, expected {EMBEDDING_DIMENSION}")
         return
     
-    index = get_faiss_index()
-    embedding_array = np.array([embedding], dtype=np.float32)
+    _queue_additions(
+        np.array([prompt_id], dtype=np.int64),
+        np.asarray(embedding, dtype=np.float32).reshape(1, -1),
+    )
     
-    position = index.ntotal
-    index.add(embedding_array)
-    _prompt_id_map[position] = prompt_id
+    logger.info(f"Queued prompt ID {prompt_id} for FAISS index")
+
+
+def add_batch_to_index(prompt_ids: List[int], embeddings: np.ndarray) -> None:
+    """
+    Queue several prompts' embeddings for the FAISS index as a single batch.
     
-    logger.info(f"Added prompt ID {prompt_id} to FAISS index at position {position}")
+    Args:
+        prompt_ids: The database IDs of the prompts, in row order
+        embeddings: An (N, 384) matrix with one embedding per prompt
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2 or embeddings.shape[1] != EMBEDDING_DIMENSION:
+        logger.error(f"Invalid embedding matrix shape: {embeddings.shape}, expected (N, {EMBEDDING_DIMENSION})")
+        return
+    if len(prompt_ids) != len(embeddings):
+        logger.error(f"Got {len(prompt_ids)} prompt IDs for {len(embeddings)} embeddings")
+        return
+    
+    _queue_additions(np.asarray(prompt_ids, dtype=np.int64), embeddings)
+    
+    logger.info(f"Queued {len(prompt_ids)} prompts for FAISS index")
 
 
-def find_similar(embedding: List[float], top_k: int = 5) -> List[Tuple[int, float]]:
+def _queue_additions(prompt_ids: np.ndarray, embeddings: np.ndarray) -> None:
+    """Hand (prompt_ids, embeddings) to the background index writer."""
+    with _index_lock:
+        # Loading the index reads these rows from the database, so queuing them too would duplicate them
+        if _faiss_index is None:
+            initialize_index()
+            return
+        
+        _pending_additions.put((prompt_ids, embeddings))
+    _start_index_writer()
+    _pending_event.set()
+
+
+def find_similar(embedding: np.ndarray, top_k: int = 5) -> List[Tuple[int, float]]:
     """
     Find the most similar prompts to the given embedding.
     
@@ -155,30 +472,35 @@ def find_similar(embedding: List[float], top_k: int = 5) -> List[Tuple[int, floa
     Returns:
         List of (prompt_id, distance) tuples, sorted by similarity (lowest distance first)
     """
-    index = get_faiss_index()
-    
-    if index.ntotal == 0:
-        logger.info("FAISS index is empty, no similar prompts found")
-        return []
-    
     if len(embedding) != EMBEDDING_DIMENSION:
         logger.error(f"Invalid embedding dimension: {len(embedding)}, expected {EMBEDDING_DIMENSION}")
         return []
     
-    # Limit top_k to available entries
-    k = min(top_k, index.ntotal)
-    
-    logger.info(f"Performing FAISS similarity search (top_k={k}, index_size={index.ntotal})")
+    embedding_array = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
     
-    embedding_array = np.array([embedding], dtype=np.float32)
-    distances, indices = index.search(embedding_array, k)
+    # Hold the lock so the background writer cannot add while searching
+    with _index_lock:
+        index = get_faiss_index()
+        
+        if index.ntotal == 0:
+            logger.info("FAISS index is empty, no similar prompts found")
+            return []
+        
+        # Limit top_k to available entries
+        k = min(top_k, index.ntotal)
+        
+        logger.info(f"Performing FAISS similarity search (top_k={k}, index_size={index.ntotal})")
+        
+        similarities, indices = index.search(embedding_array, k)
+        
+        # FAISS pads missing results with -1; map the rest to prompt IDs in one step
+        found = indices[0] >= 0
+        prompt_ids = _prompt_ids[indices[0][found]]
     
-    # Convert to list of (prompt_id, distance) tuples
-    results = []
-    for idx, distance in zip(indices[0], distances[0]):
-        if idx in _prompt_id_map:
-            prompt_id = _prompt_id_map[idx]
-            results.append((prompt_id, float(distance)))
+    # For unit vectors the squared L2 distance is 2 - 2 * inner product,
+    # which keeps the "lowest distance first" contract of this function
+    distances = 2.0 - 2.0 * similarities
+    results = list(zip(prompt_ids.tolist(), distances[0][found].tolist()))
     
     logger.info(f"FAISS search completed, found {len(results)} similar prompts")
     return results
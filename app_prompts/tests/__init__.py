@@ -1,2 +1,8 @@
 # Test package for app_prompts
 
+# Password strength is not under test; MD5 keeps create_user and /login/ cheap
+# even when the suite runs with the dev settings module (as in CI)
+FAST_PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
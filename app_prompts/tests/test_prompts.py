@@ -1,22 +1,102 @@
-import time
+import zlib
+from unittest import mock
+import numpy as np
 from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APITestCase, APIClient
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.throttling import SimpleRateThrottle
 from ..models import Prompt
+from ..serializers import PromptCreateSerializer
 from .. import services
-
-
+from . import FAST_PASSWORD_HASHERS
+
+
+def _fake_embedding(text):
+    """Deterministic unit-norm stand-in for services.get_embedding."""
+    rng = np.random.default_rng(zlib.crc32(text.encode()))
+    vector = rng.standard_normal(384).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector
+
+
+def _fake_response(text):
+    """Deterministic stand-in for services.generate_response."""
+    return f'Mocked response to: {text}'
+
+
+class FakeAIServicesMixin:
+    """
+    Replaces embedding and response generation with fakes for the whole class,
+    including setUpTestData. Endpoint tests cover the view contract;
+    ServiceLayerTests covers the real services.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        for target, fake in (
+            ('app_prompts.services.get_embedding', _fake_embedding),
+            ('app_prompts.services.generate_response', _fake_response),
+        ):
+            patcher = mock.patch(target, new=fake)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        super().setUpClass()
+
+
+def _seed_prompts(user, texts):
+    """Insert prompts with embeddings directly and index them, bypassing the API."""
+    embeddings = [services.get_embedding(text) for text in texts]
+    prompts = Prompt.objects.bulk_create([
+        Prompt(
+            user=user,
+            prompt_text=text,
+            response_text=services.generate_response(text),
+            embedding=services.embedding_to_bytes(embedding),
+        )
+        for text, embedding in zip(texts, embeddings)
+    ])
+    for prompt, embedding in zip(prompts, embeddings):
+        services.add_to_index(prompt.id, embedding)
+    return prompts
+
+
+class TokenCacheMixin:
+    """Issues JWT access tokens once per test class instead of once per test."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls._token_cache = {}
+
+    @classmethod
+    def get_auth_token(cls, username, password):
+        """
+        Return a cached JWT access token, logging in on first use.
+        
+        Only call this for users created in setUpTestData; the cache outlives
+        each test, so users created inside a test should log in directly.
+        """
+        key = (username, password)
+        if key not in cls._token_cache:
+            cls._token_cache[key] = APIClient().post('/login/', {
+                'username': username,
+                'password': password
+            }).data['access']
+        return cls._token_cache[key]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class JWTAuthenticationTests(APITestCase):
     """Tests for JWT authentication."""
 
-    def setUp(self):
-        """Create test user."""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create test user once for the class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
         )
-        self.client = APIClient()
 
     def test_login_returns_tokens(self):
         """Test that login endpoint returns access and refresh tokens."""
@@ -37,118 +117,114 @@ class JWTAuthenticationTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PromptEndpointTests(APITestCase):
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class PromptEndpointTests(TokenCacheMixin, APITestCase):
     """Tests for protected prompt endpoints."""
 
-    def setUp(self):
-        """Create test users and prompts."""
-        self.user1 = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Create test users, prompts and tokens once for the class."""
+        super().setUpTestData()
+        cls.user1 = User.objects.create_user(
             username='user1',
             password='pass123'
         )
-        self.user2 = User.objects.create_user(
+        cls.user2 = User.objects.create_user(
             username='user2',
             password='pass123'
         )
-        self.client = APIClient()
 
         # Create prompts for user1
-        self.prompt1 = Prompt.objects.create(
-            user=self.user1,
+        cls.prompt1 = Prompt.objects.create(
+            user=cls.user1,
             prompt_text='Test prompt 1',
             response_text='Test response 1'
         )
-        self.prompt2 = Prompt.objects.create(
-            user=self.user1,
+        cls.prompt2 = Prompt.objects.create(
+            user=cls.user1,
             prompt_text='Test prompt 2',
             response_text='Test response 2'
         )
 
-    def get_auth_token(self, username, password):
-        """Helper method to get JWT token."""
-        response = self.client.post('/login/', {
-            'username': username,
-            'password': password
-        })
-        return response.data['access']
-
-    def test_unauthenticated_list_prompts_returns_401(self):
-        """Test that listing prompts without auth returns 401."""
-        response = self.client.get('/prompts/')
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-
-    def test_unauthenticated_create_prompt_returns_401(self):
-        """Test that creating prompt without auth returns 401."""
-        response = self.client.post('/prompts/', {
-            'prompt_text': 'New prompt',
-            'response_text': 'New response'
-        })
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-
-    def test_unauthenticated_retrieve_prompt_returns_401(self):
-        """Test that retrieving prompt without auth returns 401."""
-        response = self.client.get(f'/prompts/{self.prompt1.id}/')
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        cls.prompt1_url = f'/prompts/{cls.prompt1.id}/'
+        cls.bearer1 = f"Bearer {cls.get_auth_token('user1', 'pass123')}"
+        cls.bearer2 = f"Bearer {cls.get_auth_token('user2', 'pass123')}"
+
+    def test_unauthenticated_requests_return_401(self):
+        """Test that listing, creating and retrieving prompts without auth returns 401."""
+        requests = [
+            ('list', self.client.get, '/prompts/', None),
+            ('create', self.client.post, '/prompts/', {
+                'prompt_text': 'New prompt',
+                'response_text': 'New response'
+            }),
+            ('retrieve', self.client.get, self.prompt1_url, None),
+        ]
+        for action, send, url, data in requests:
+            with self.subTest(action=action):
+                response = send(url, data)
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_authenticated_list_prompts(self):
         """Test that authenticated user can list their prompts."""
-        token = self.get_auth_token('user1', 'pass123')
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=self.bearer1)
         
-        response = self.client.get('/prompts/')
+        # One query for the JWT user and one for the prompts with their user joined
+        with self.assertNumQueries(2):
+            response = self.client.get('/prompts/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
 
     def test_authenticated_retrieve_prompt(self):
         """Test that authenticated user can retrieve their prompt."""
-        token = self.get_auth_token('user1', 'pass123')
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=self.bearer1)
         
-        response = self.client.get(f'/prompts/{self.prompt1.id}/')
+        response = self.client.get(self.prompt1_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['prompt_text'], 'Test prompt 1')
 
     def test_user_cannot_access_other_user_prompts(self):
         """Test that users can only see their own prompts."""
-        token = self.get_auth_token('user2', 'pass123')
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=self.bearer2)
         
         # User2 should not see user1's prompts
-        response = self.client.get('/prompts/')
+        with self.assertNumQueries(2):
+            response = self.client.get('/prompts/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 0)
 
         # User2 should not be able to retrieve user1's prompt
-        response = self.client.get(f'/prompts/{self.prompt1.id}/')
+        response = self.client.get(self.prompt1_url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_jwt_authentication_with_bearer_token(self):
         """Test that JWT authentication works with Bearer token format."""
-        token = self.get_auth_token('user1', 'pass123')
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=self.bearer1)
         
         response = self.client.get('/prompts/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
-class PromptCreationTests(APITestCase):
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class PromptCreationTests(FakeAIServicesMixin, TokenCacheMixin, APITestCase):
     """Tests for Phase 3: Auto-generation of responses and embeddings."""
 
+    @classmethod
+    def setUpTestData(cls):
+        """Create test user and token once for the class."""
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        cls.token = cls.get_auth_token('testuser', 'testpass123')
+
     def setUp(self):
-        """Initialize test user and client."""
+        """Initialize authenticated client."""
         # Clear cache to reset throttle counters between tests
         cache.clear()
         
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.client = APIClient()
-        token = self.client.post('/login/', {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }).data['access']
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
 
     def test_create_prompt_with_only_prompt_text(self):
         """Test that prompt creation auto-generates response and embedding."""
@@ -161,7 +237,9 @@ class PromptCreationTests(APITestCase):
         self.assertIn('response_text', response.data)
         self.assertIsNotNone(response.data['response_text'])
         # Note: Embeddings are generated and stored internally but not exposed in API responses
-        # for security and response cleanliness
+        # for security and response cleanliness, so check the stored row directly
+        prompt = Prompt.objects.get(pk=response.data['id'])
+        self.assertEqual(len(prompt.embedding), 384 * 2)
 
     def test_create_prompt_with_websocket_flag(self):
         """Test that websocket flag is accepted (Phase 4 preparation)."""
@@ -173,6 +251,58 @@ class PromptCreationTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['prompt_text'], 'Hello there')
 
+    def test_websocket_push_is_sent_after_commit(self):
+        """Test that the WebSocket push is deferred until the prompt is committed."""
+        with mock.patch('app_prompts.views._send_prompt_response', new_callable=mock.AsyncMock) as send:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post('/prompts/', {
+                    'prompt_text': 'Hello there',
+                    'websocket': True
+                })
+            
+            send.assert_not_called()
+            for callback in callbacks:
+                callback()
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        send.assert_awaited_once_with('testuser', response.data['id'], response.data)
+
+    def test_create_prompt_with_json_body(self):
+        """Test that a JSON body is accepted and prompt text is trimmed."""
+        response = self.client.post('/prompts/', {
+            'prompt_text': '  Hello there  ',
+            'websocket': False
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['prompt_text'], 'Hello there')
+
+    def test_json_and_form_bodies_validate_the_same(self):
+        """Test that the JSON fast path and form parsing accept and reject the same input."""
+        for prompt_text in ('  Hello there  ', '', '   ', 'Hello\x00there', ' Héllo wörld ', '\u3000'):
+            with self.subTest(prompt_text=prompt_text):
+                responses = []
+                for body_format in ('json', 'multipart'):
+                    # Each request counts against the prompt throttle
+                    cache.clear()
+                    response = self.client.post('/prompts/', {'prompt_text': prompt_text}, format=body_format)
+                    if response.status_code == status.HTTP_201_CREATED:
+                        responses.append((response.status_code, response.data['prompt_text']))
+                    else:
+                        responses.append((response.status_code, response.data))
+                self.assertEqual(responses[0], responses[1])
+
+    def test_json_body_runs_prompt_text_validation(self):
+        """Test that the JSON fast path reports validate_prompt_text errors like form parsing."""
+        rejected = serializers.ValidationError('Rejected.')
+        with mock.patch.object(PromptCreateSerializer, 'validate_prompt_text', side_effect=rejected):
+            for body_format in ('json', 'multipart'):
+                with self.subTest(format=body_format):
+                    cache.clear()
+                    response = self.client.post('/prompts/', {'prompt_text': 'Hello'}, format=body_format)
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                    self.assertEqual(response.data, {'prompt_text': ['Rejected.']})
+
     def test_create_prompt_with_empty_text_fails(self):
         """Test that empty prompt text is rejected."""
         response = self.client.post('/prompts/', {
@@ -189,60 +319,82 @@ class PromptCreationTests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_batch_create_prompts(self):
+        """Test that the batch endpoint creates and indexes every prompt."""
+        services.reset_index()
+        
+        texts = ['Hello there', 'What is Python?', 'Tell me about Django']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/prompts/batch/', {'prompt_texts': texts}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['prompt_text'] for item in response.data], texts)
+        self.assertEqual(Prompt.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(services.get_faiss_index().ntotal, 3)
+        
+        # Batch embeddings come from the same (patched) get_embedding as single prompts
+        stored = Prompt.objects.get(user=self.user, prompt_text='Hello there')
+        self.assertEqual(stored.embedding, services.embedding_to_bytes(_fake_embedding('Hello there')))
+
+    def test_batch_create_rejects_empty_text(self):
+        """Test that a batch with an empty or whitespace-only text is rejected."""
+        for texts in ([], ['Valid prompt', '   ']):
+            with self.subTest(texts=texts):
+                # Each request counts against the batch throttle
+                cache.clear()
+                response = self.client.post('/prompts/batch/', {'prompt_texts': texts}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_created_prompt_is_added_to_faiss_index(self):
         """Test that created prompts are automatically indexed."""
-        # Initialize index
-        services.initialize_index()
+        # Start from an empty index
+        services.reset_index()
         initial_count = services.get_faiss_index().ntotal
         
-        response = self.client.post('/prompts/', {
-            'prompt_text': 'Test indexing'
-        })
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/prompts/', {
+                'prompt_text': 'Test indexing'
+            })
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Nothing is indexed until the transaction commits
+        self.assertEqual(services.get_faiss_index().ntotal, initial_count)
+        
+        for callback in callbacks:
+            callback()
         new_count = services.get_faiss_index().ntotal
         self.assertEqual(new_count, initial_count + 1)
 
-    def test_response_generation_varies_by_content(self):
-        """Test that different prompts generate different responses."""
-        response1 = self.client.post('/prompts/', {
-            'prompt_text': 'Hello world'
-        })
-        self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
-        
-        # Wait for throttle to reset, as throttling isn't a requisite for testing
-        time.sleep(1.1)
-        
-        response2 = self.client.post('/prompts/', {
-            'prompt_text': 'What is Python?'
-        })
-        self.assertEqual(response2.status_code, status.HTTP_201_CREATED)
-        self.assertNotEqual(
-            response1.data['response_text'],
-            response2.data['response_text']
-        )
-
 
-class SimilaritySearchTests(APITestCase):
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class SimilaritySearchTests(FakeAIServicesMixin, TokenCacheMixin, APITestCase):
     """Tests for Phase 3: Semantic similarity search."""
 
+    @classmethod
+    def setUpTestData(cls):
+        """Create test user, token and shared prompts once for the class."""
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        cls.token = cls.get_auth_token('testuser', 'testpass123')
+        
+        # Prompts shared by the read-only search tests
+        cls.seeded_prompts = _seed_prompts(cls.user, [
+            'What is Python programming?',
+            'How to learn Python?',
+            'Best practices in coding',
+        ])
+
     def setUp(self):
-        """Initialize test user, client, and test prompts."""
+        """Initialize authenticated client and the FAISS index."""
         # Clear cache to reset throttle counters between tests
         cache.clear()
         
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.client = APIClient()
-        token = self.client.post('/login/', {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }).data['access']
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
         
-        # Create test prompts with embeddings
+        # Rebuild the index from the class-level prompts
         services.initialize_index()
         
     def test_similar_endpoint_requires_prompt_parameter(self):
@@ -260,6 +412,8 @@ class SimilaritySearchTests(APITestCase):
 
     def test_similar_endpoint_returns_empty_list_when_no_prompts(self):
         """Test that similar endpoint returns empty list when no prompts exist."""
+        services.reset_index()
+        
         response = self.client.get('/prompts/similar/?prompt=test')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -267,11 +421,6 @@ class SimilaritySearchTests(APITestCase):
 
     def test_similar_endpoint_finds_related_prompts(self):
         """Test that similar endpoint finds semantically related prompts."""
-        # Create multiple prompts
-        self.client.post('/prompts/', {'prompt_text': 'What is Python programming?'})
-        self.client.post('/prompts/', {'prompt_text': 'How to learn Python?'})
-        self.client.post('/prompts/', {'prompt_text': 'Best practices in coding'})
-        
         # Search for similar prompts
         response = self.client.get('/prompts/similar/?prompt=Python programming language')
         
@@ -283,79 +432,102 @@ class SimilaritySearchTests(APITestCase):
             self.assertIn('similarity_score', result)
             self.assertIn('prompt_text', result)
             self.assertIn('response_text', result)
+        
+        # Results are ordered from most to least similar
+        scores = [result['similarity_score'] for result in response.data]
+        self.assertEqual(scores, sorted(scores))
 
     def test_similar_endpoint_returns_top_5_results(self):
         """Test that similar endpoint returns at most 5 results."""
         # Create 10 prompts
-        for i in range(10):
-            self.client.post('/prompts/', {'prompt_text': f'Test prompt number {i}'})
+        _seed_prompts(self.user, [f'Test prompt number {i}' for i in range(10)])
         
         response = self.client.get('/prompts/similar/?prompt=Test prompt')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertLessEqual(len(response.data), 5)
+        self.assertEqual(len(response.data), 5)
 
     def test_similar_endpoint_only_shows_user_prompts(self):
         """Test that users only see their own prompts in similarity search."""
-        # Create prompt for user1
-        self.client.post('/prompts/', {'prompt_text': 'User 1 prompt'})
-        
-        # Create second user and their prompt
+        # The class-level prompts belong to the first user
+        # Create second user
         user2 = User.objects.create_user(username='user2', password='pass123')
         token2 = self.client.post('/login/', {
             'username': 'user2',
             'password': 'pass123'
         }).data['access']
         
-        client2 = APIClient()
-        client2.credentials(HTTP_AUTHORIZATION=f'Bearer {token2}')
+        # Switch the client to user2
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token2}')
         
         # User2 searches - should not see user1's prompts
-        response = client2.get('/prompts/similar/?prompt=User 1 prompt')
+        response = self.client.get('/prompts/similar/?prompt=User 1 prompt')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 0)
 
 
-class ThrottlingTests(APITestCase):
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class ThrottlingTests(FakeAIServicesMixin, TokenCacheMixin, APITestCase):
     """Tests for Phase 3: API throttling."""
 
+    @classmethod
+    def setUpTestData(cls):
+        """Create test user and token once for the class."""
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        cls.token = cls.get_auth_token('testuser', 'testpass123')
+
     def setUp(self):
-        """Initialize test user and client."""
+        """Initialize authenticated client."""
         # Clear cache to reset throttle counters between tests
         cache.clear()
         
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.client = APIClient()
-        token = self.client.post('/login/', {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }).data['access']
-        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
 
     def test_prompt_creation_throttle_one_per_second(self):
         """Test that prompt creation is throttled to 1 per second."""
-        # First request should succeed
-        response1 = self.client.post('/prompts/', {
-            'prompt_text': 'First prompt'
-        })
-        self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
-        
-        # Immediate second request should be throttled
-        response2 = self.client.post('/prompts/', {
-            'prompt_text': 'Second prompt'
-        })
-        self.assertEqual(response2.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
-        
-        # Wait 1 second and retry
-        time.sleep(1.1)
-        response3 = self.client.post('/prompts/', {
-            'prompt_text': 'Third prompt'
-        })
-        self.assertEqual(response3.status_code, status.HTTP_201_CREATED)
+        # Drive the throttle clock explicitly instead of waiting on the wall clock
+        with mock.patch.object(SimpleRateThrottle, 'timer') as timer:
+            # First request should succeed
+            timer.return_value = 1000.0
+            response1 = self.client.post('/prompts/', {
+                'prompt_text': 'First prompt'
+            })
+            self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
+            
+            # Second request within the same second should be throttled
+            timer.return_value = 1000.5
+            response2 = self.client.post('/prompts/', {
+                'prompt_text': 'Second prompt'
+            })
+            self.assertEqual(response2.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            
+            # Once the 1 second window has passed the request succeeds again
+            timer.return_value = 1001.5
+            response3 = self.client.post('/prompts/', {
+                'prompt_text': 'Third prompt'
+            })
+            self.assertEqual(response3.status_code, status.HTTP_201_CREATED)
+
+    def test_batch_creation_has_its_own_throttle(self):
+        """Test that batches are throttled separately and more tightly than single prompts."""
+        with mock.patch.object(SimpleRateThrottle, 'timer') as timer:
+            timer.return_value = 1000.0
+            response1 = self.client.post('/prompts/batch/', {'prompt_texts': ['First']}, format='json')
+            self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
+            
+            # A single prompt is still allowed after a batch
+            response2 = self.client.post('/prompts/', {'prompt_text': 'Single prompt'})
+            self.assertEqual(response2.status_code, status.HTTP_201_CREATED)
+            
+            # A second batch after the 1 second prompt window is still throttled
+            timer.return_value = 1002.0
+            response3 = self.client.post('/prompts/batch/', {'prompt_texts': ['Second']}, format='json')
+            self.assertEqual(response3.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
 
     def test_other_endpoints_not_affected_by_prompt_throttle(self):
         """Test that other endpoints use different throttle settings."""
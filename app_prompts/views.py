@@ -1,23 +1,93 @@
+import asyncio
 import logging
+import threading
+from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
-from channels.layers import get_channel_layer
+from channels.layers import InMemoryChannelLayer, get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import Prompt
-from .serializers import PromptSerializer, PromptCreateSerializer, SimilarPromptSerializer, PromptPublicSerializer
+from .serializers import (
+    PromptSerializer,
+    PromptCreateSerializer,
+    PromptBatchCreateSerializer,
+    SimilarPromptSerializer,
+    PromptPublicSerializer,
+)
 from . import services
 
 logger = logging.getLogger(__name__)
 
+# Default channel layer, looked up on first WebSocket send and reused afterwards
+_channel_layer = None
+
+
+def _get_channel_layer():
+    """Return the default channel layer, resolving it once per process."""
+    global _channel_layer
+    if _channel_layer is None:
+        _channel_layer = get_channel_layer()
+    return _channel_layer
+
+
+# WebSocket pushes run on one long-lived event loop thread so the HTTP response does
+# not wait on the channel layer, and the layer's per-loop connection pool is reused
+_websocket_loop = None
+_websocket_loop_lock = threading.Lock()
+
+
+def _get_websocket_loop():
+    """Return the background event loop for WebSocket pushes, starting it on first use."""
+    global _websocket_loop
+    with _websocket_loop_lock:
+        if _websocket_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='ws-send', daemon=True).start()
+            _websocket_loop = loop
+        return _websocket_loop
+
+
+async def _send_prompt_response(username, prompt_id, data):
+    """Push a created prompt to the user's WebSocket group, logging any failure."""
+    try:
+        await _get_channel_layer().group_send(
+            f"user_{username}",
+            {
+                "type": "send_prompt_response",
+                "data": data,
+            },
+        )
+        logger.info(f"Sent prompt ID={prompt_id} via WebSocket to user={username}")
+    except Exception as e:
+        logger.error(f"Failed to send WebSocket message for prompt ID={prompt_id}: {e}")
+
+
+def _dispatch_prompt_response(username, prompt_id, data):
+    """Schedule a prompt response on the push loop, or send inline for the in-memory layer."""
+    if isinstance(_get_channel_layer(), InMemoryChannelLayer):
+        # In-memory queues belong to the server's event loop, which the push
+        # loop cannot reach; send from the calling thread instead
+        async_to_sync(_send_prompt_response)(username, prompt_id, data)
+    else:
+        asyncio.run_coroutine_threadsafe(
+            _send_prompt_response(username, prompt_id, data),
+            _get_websocket_loop(),
+        )
+
 
 class PromptThrottle(UserRateThrottle):
     """Custom throttle for prompt creation: 1 request per second."""
     scope = 'prompt'
 
 
+class PromptBatchThrottle(UserRateThrottle):
+    """Custom throttle for batch prompt creation, which creates up to 100 prompts per request."""
+    scope = 'prompt_batch'
+
+
 class PromptViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing user prompts.
@@ -28,18 +98,23 @@ class PromptViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return prompts for the authenticated user only."""
-        return Prompt.objects.filter(user=self.request.user)
+        # Serializers render user.username, so join the user instead of one query per row
+        return Prompt.objects.filter(user=self.request.user).select_related('user')
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
         if self.action == 'create':
             return PromptCreateSerializer
+        if self.action == 'batch':
+            return PromptBatchCreateSerializer
         return PromptPublicSerializer
 
     def get_throttles(self):
-        """Apply custom throttle only for create action."""
+        """Apply custom throttle only for create actions."""
         if self.action == 'create':
             return [PromptThrottle()]
+        if self.action == 'batch':
+            return [PromptBatchThrottle()]
         return super().get_throttles()
 
     def create(self, request, *args, **kwargs):
@@ -49,28 +124,10 @@ class PromptViewSet(viewsets.ModelViewSet):
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-
-        prompt_text = serializer.validated_data['prompt_text']
         websocket = serializer.validated_data.get('websocket', False)
 
-        # Generate response using service layer
-        logger.info(f"Generating response for user={request.user.username}, prompt_length={len(prompt_text)}")
-        response_text = services.generate_response(prompt_text)
-
-        # Compute embedding
-        logger.info(f"Computing embedding for user={request.user.username}")
-        embedding = services.get_embedding(prompt_text)
-
-        # Save to database
-        prompt = Prompt.objects.create(
-            user=request.user,
-            prompt_text=prompt_text,
-            response_text=response_text,
-            embedding=embedding
-        )
-
-        # Add to FAISS index
-        services.add_to_index(prompt.id, embedding)
+        # Generates the response and embedding, saves and indexes the prompt
+        prompt = serializer.save(user=request.user)
 
         # Log the creation
         logger.info(f"Created prompt ID={prompt.id} for user={request.user.username}")
@@ -79,24 +136,34 @@ class PromptViewSet(viewsets.ModelViewSet):
         response_serializer = PromptPublicSerializer(prompt)
         response_data = response_serializer.data
 
-        # Send via WebSocket if requested
+        # Send via WebSocket if requested, once the prompt is committed
         if websocket:
-            try:
-                channel_layer = get_channel_layer()
-                async_to_sync(channel_layer.group_send)(
-                    f"user_{request.user.username}",
-                    {
-                        "type": "send_prompt_response",
-                        "data": response_data,
-                    },
-                )
-                logger.info(f"Sent prompt ID={prompt.id} via WebSocket to user={request.user.username}")
-            except Exception as e:
-                logger.error(f"Failed to send WebSocket message for prompt ID={prompt.id}: {e}")
+            username = request.user.username
+            transaction.on_commit(
+                lambda: _dispatch_prompt_response(username, prompt.id, response_data)
+            )
 
         # Return the created prompt
         return Response(response_data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Create several prompts in one request.
+        Accepts: prompt_texts (required, list of 1-100 strings)
+        Embeddings are computed as one matrix and added to FAISS in a single batch.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Generates responses and embeddings, saves and indexes the prompts
+        prompts = serializer.save(user=request.user)
+
+        logger.info(f"Created {len(prompts)} prompts for user={request.user.username}")
+
+        response_serializer = PromptPublicSerializer(prompts, many=True)
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'], url_path='similar')
     def similar(self, request):
         """
@@ -132,24 +199,19 @@ class PromptViewSet(viewsets.ModelViewSet):
             logger.info(f"Similarity search by user={request.user.username}, found 0 results")
             return Response([], status=status.HTTP_200_OK)
 
-        # Fetch prompt objects and filter by user's access
+        # Fetch prompt objects in one query, keyed by ID, and filter by user's access
         prompt_ids = [prompt_id for prompt_id, _ in similar_results]
         prompts = Prompt.objects.filter(
-            id__in=prompt_ids,
             user=request.user  # Only return user's own prompts
-        )
-
-        # Create a mapping of prompt_id to distance
-        distance_map = {prompt_id: distance for prompt_id, distance in similar_results}
+        ).select_related('user').in_bulk(prompt_ids)
 
-        # Add similarity scores to prompts
+        # Results are already ordered by distance (lower = more similar)
         prompts_with_scores = []
-        for prompt in prompts:
-            prompt.similarity_score = distance_map.get(prompt.id, 0.0)
-            prompts_with_scores.append(prompt)
-
-        # Sort by similarity (lower distance = more similar)
-        prompts_with_scores.sort(key=lambda p: p.similarity_score)
+        for prompt_id, distance in similar_results:
+            prompt = prompts.get(prompt_id)
+            if prompt is not None:
+                prompt.similarity_score = distance
+                prompts_with_scores.append(prompt)
 
         # Serialize and return
         serializer = SimilarPromptSerializer(prompts_with_scores, many=True)